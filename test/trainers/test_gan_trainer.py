@@ -5,6 +5,7 @@ import torch
 from torch.utils.data import Dataset
 from torch.utils.data.dataloader import DataLoader
 from torcheeg.trainers import CWGANGPTrainer, WGANGPTrainer
+from torcheeg.trainers.generative.utils import FrechetInceptionDistance
 from torcheeg.models import BGenerator, BDiscriminator, BCGenerator, BCDiscriminator
 
 
@@ -103,6 +104,67 @@ class TestWGANGPTrainer(unittest.TestCase):
         trainer.fit(train_loader, val_loader, max_epochs=1)
         trainer.test(test_loader)
 
+    def test_wgan_gp_trainer_options(self):
+        train_dataset = DummyDataset()
+        val_dataset = DummyDataset()
+        test_dataset = DummyDataset()
+
+        train_loader = DataLoader(train_dataset, batch_size=64)
+        val_loader = DataLoader(val_dataset, batch_size=64)
+        test_loader = DataLoader(test_dataset, batch_size=64)
+
+        g_model = BGenerator(in_channels=128)
+        d_model = BDiscriminator(in_channels=4)
+
+        trainer = WGANGPTrainer(g_model,
+                                d_model,
+                                metric_extractor=Extractor(),
+                                metric_classifier=Classifier(),
+                                metric_num_features=9 * 9 * 64,
+                                metrics=['fid', 'is'],
+                                metric_update_every=2,
+                                channels_last=True,
+                                accelerator='gpu')
+        trainer.fit(train_loader, val_loader, max_epochs=1)
+        trainer.test(test_loader)
+
+        with self.assertRaises(AssertionError):
+            WGANGPTrainer(BGenerator(in_channels=128),
+                          BDiscriminator(in_channels=4),
+                          metric_update_every=0)
+
+    def test_wgan_gp_trainer_compile(self):
+        if not hasattr(torch, 'compile'):
+            return
+
+        g_model = BGenerator(in_channels=128)
+        d_model = BDiscriminator(in_channels=4)
+
+        trainer = WGANGPTrainer(g_model, d_model, compile='reduce-overhead')
+        trainer.on_fit_start()
+        self.assertTrue(hasattr(trainer.generator, '_orig_mod'))
+        self.assertTrue(hasattr(trainer.discriminator, '_orig_mod'))
+
+    def test_fid_update_features(self):
+        extractor = Extractor()
+        fid_update = FrechetInceptionDistance(extractor, 9 * 9 * 64)
+        fid_features = FrechetInceptionDistance(extractor, 9 * 9 * 64)
+
+        real = torch.randn(8, 4, 9, 9)
+        fake = torch.randn(8, 4, 9, 9)
+
+        with torch.no_grad():
+            fid_update.update(real, real=True)
+            fid_update.update(fake, real=False)
+
+            features = extractor(torch.cat([real, fake], dim=0))
+            real_features, fake_features = features.chunk(2)
+            fid_features.update_features(real_features, real=True)
+            fid_features.update_features(fake_features, real=False)
+
+        self.assertTrue(
+            torch.allclose(fid_update.compute(), fid_features.compute()))
+
     def test_cwgan_gp_trainer(self):
         train_dataset = DummyDataset()
         val_dataset = DummyDataset()
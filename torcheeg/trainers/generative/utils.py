@@ -74,8 +74,8 @@ class FrechetInceptionDistance(_FrechetInceptionDistance):
                        torch.tensor(0).long(),
                        dist_reduce_fx="sum")
 
-    def update(self, imgs: torch.Tensor, real: bool) -> None:
-        features = self.inception(imgs)
+    def _accumulate_features(self, features: torch.Tensor,
+                             real: bool) -> None:
         self.orig_dtype = features.dtype
         features = features.double()
 
@@ -84,11 +84,25 @@ class FrechetInceptionDistance(_FrechetInceptionDistance):
         if real:
             self.real_features_sum += features.sum(dim=0)
             self.real_features_cov_sum += features.t().mm(features)
-            self.real_features_num_samples += imgs.shape[0]
+            self.real_features_num_samples += features.shape[0]
         else:
             self.fake_features_sum += features.sum(dim=0)
             self.fake_features_cov_sum += features.t().mm(features)
-            self.fake_features_num_samples += imgs.shape[0]
+            self.fake_features_num_samples += features.shape[0]
+
+    def update_features(self, features: torch.Tensor, real: bool) -> None:
+        r"""Accumulate statistics from precomputed extractor features,
+        allowing callers to share one extractor forward between the real and
+        fake batches."""
+        # torchmetrics only wraps ``update``/``compute``, so replicate the
+        # wrapper's bookkeeping here: invalidate the compute cache and count
+        # the update, otherwise ``compute`` warns that no update was called
+        self._computed = None
+        self._update_count += 1
+        self._accumulate_features(features, real)
+
+    def update(self, imgs: torch.Tensor, real: bool) -> None:
+        self._accumulate_features(self.inception(imgs), real)
 
     def compute(self) -> torch.Tensor:
         if self.real_features_num_samples < 2 or self.fake_features_num_samples < 2:
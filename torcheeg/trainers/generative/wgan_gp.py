@@ -1,6 +1,6 @@
 import logging
 import warnings
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Tuple, Union
 
 import pytorch_lightning as pl
 import torch
@@ -16,24 +16,51 @@ _EVALUATE_OUTPUT = List[Dict[str, float]]  # 1 dict per DataLoader
 
 log = logging.getLogger('torcheeg')
 
+# keys of inference warnings already emitted, so repeated trainer
+# constructions (e.g. across cross-validation folds) warn only once
+_WARNED_ONCE = set()
 
-def gradient_penalty(model, real, fake, *args, **kwargs):
-    device = real.device
-    real = real.data
-    fake = fake.data
-    alpha = torch.rand(real.size(0), *([1] * (len(real.shape) - 1))).to(device)
-    inputs = alpha * real + ((1 - alpha) * fake)
-    inputs.requires_grad_()
 
-    outputs = model(inputs, *args, **kwargs)
-    gradient = autograd.grad(outputs=outputs,
-                             inputs=inputs,
-                             grad_outputs=torch.ones_like(outputs).to(device),
-                             create_graph=True,
-                             retain_graph=True,
-                             only_inputs=True)[0]
+def gradient_penalty_inputs(real, fake):
+    real = real.detach()
+    fake = fake.detach()
+    alpha = torch.rand((real.size(0), ) + (1, ) * (real.ndim - 1),
+                       device=real.device)
+    # lerp(fake, real, alpha) = alpha * real + (1 - alpha) * fake, fused
+    # into one kernel instead of three element-wise ones
+    inputs = torch.lerp(fake.float(), real.float(), alpha)
+    inputs.requires_grad_()
+    return inputs
+
+
+def gradient_penalty_from_outputs(outputs, inputs, create_graph: bool = True):
+    # the double backward through autograd.grad is only numerically stable in
+    # FP32, so the penalty path always runs with autocast disabled;
+    # create_graph=False skips the double-backward graph when the penalty is
+    # only monitored, e.g. during validation and test
+    with torch.cuda.amp.autocast(enabled=False):
+        gradient = autograd.grad(
+            outputs=outputs,
+            inputs=inputs,
+            grad_outputs=torch.ones(outputs.shape,
+                                    device=outputs.device,
+                                    dtype=outputs.dtype),
+            create_graph=create_graph,
+            retain_graph=create_graph,
+            only_inputs=True)[0]
     gradient = gradient.flatten(1)
-    return ((gradient.norm(2, dim=1) - 1)**2).mean()
+    norm = torch.linalg.vector_norm(gradient, ord=2, dim=1)
+    return torch.mean(torch.square(norm - 1.0))
+
+
+def gradient_penalty(model, real, fake, *args, create_graph: bool = True,
+                     **kwargs):
+    inputs = gradient_penalty_inputs(real, fake)
+    with torch.cuda.amp.autocast(enabled=False):
+        outputs = model(inputs, *args, **kwargs)
+    return gradient_penalty_from_outputs(outputs,
+                                         inputs,
+                                         create_graph=create_graph)
 
 
 class WGANGPTrainer(pl.LightningModule):
@@ -64,7 +91,11 @@ class WGANGPTrainer(pl.LightningModule):
         metric_extractor (nn.Module): The feature extractor model for computing the FID score. (default: :obj:`None`)
         metric_classifier (nn.Module): The classifier model for computing the IS score. (default: :obj:`None`)
         metric_num_features (int): The number of features extracted by the metric_extractor. If not specified, it will be inferred from the :obj:`in_channels` attribute of the metric_extractor. (default: :obj:`None`)
-    
+        metric_update_every (int): The interval (in batches) at which the FID/IS metrics are updated, allowing the metric extractor cost to be amortized over several batches. (default: :obj:`1`)
+        channels_last (bool): Whether to convert the models and 4-D inputs to the :obj:`torch.channels_last` memory format, which enables the faster NHWC convolution kernels on recent GPUs. (default: :obj:`False`)
+        compile (bool or str): Whether to compile the generator and the discriminator with :obj:`torch.compile` (requires PyTorch 2.0). Pass a string such as :obj:`'max-autotune'` or :obj:`'reduce-overhead'` to select the compile mode; :obj:`True` uses :obj:`'max-autotune'`. (default: :obj:`False`)
+        amp (bool): Whether to run the generator and discriminator forward passes with FP16 automatic mixed precision. Only takes effect on the gpu accelerator; the gradient penalty always runs in FP32. (default: :obj:`True`)
+
     .. automethod:: fit
     .. automethod:: test
     '''
@@ -82,7 +113,11 @@ class WGANGPTrainer(pl.LightningModule):
                  metrics: List[str] = [],
                  metric_extractor: nn.Module = None,
                  metric_classifier: nn.Module = None,
-                 metric_num_features: int = None):
+                 metric_num_features: int = None,
+                 metric_update_every: int = 1,
+                 channels_last: bool = False,
+                 compile: Union[bool, str] = False,
+                 amp: bool = True):
         super().__init__()
         self.automatic_optimization = False
 
@@ -95,9 +130,13 @@ class WGANGPTrainer(pl.LightningModule):
         self.weight_gradient_penalty = weight_gradient_penalty
 
         if hasattr(generator, 'in_channels') and latent_channels is None:
-            warnings.warn(
-                f'No latent_channels specified, use generator.in_channels ({generator.in_channels}) as latent_channels.'
-            )
+            key = ('latent_channels', type(generator).__name__,
+                   generator.in_channels)
+            if key not in _WARNED_ONCE:
+                warnings.warn(
+                    f'No latent_channels specified, use generator.in_channels ({generator.in_channels}) as latent_channels.'
+                )
+                _WARNED_ONCE.add(key)
             latent_channels = generator.in_channels
         assert not latent_channels is None, 'The latent_channels should be specified.'
         self.latent_channels = latent_channels
@@ -106,14 +145,32 @@ class WGANGPTrainer(pl.LightningModule):
         self.accelerator = accelerator
         self.metrics = metrics
 
-        self.bce_fn = nn.BCEWithLogitsLoss()
+        self.amp = amp
+        self.scaler_g = torch.cuda.amp.GradScaler(
+            enabled=self.amp and self.accelerator == 'gpu')
+        self.scaler_d = torch.cuda.amp.GradScaler(
+            enabled=self.amp and self.accelerator == 'gpu')
+        self._latent_gen = None
+        self.channels_last = channels_last
+        self.compile = compile
 
         self.metric_extractor = metric_extractor
         self.metric_classifier = metric_classifier
         self.metric_num_features = metric_num_features
+        assert metric_update_every >= 1, 'The metric_update_every should be a positive integer.'
+        self.metric_update_every = metric_update_every
         self.init_metrics(metrics)
 
+        # start from None grads so the first iteration skips the memset
+        self.generator.zero_grad(set_to_none=True)
+        self.discriminator.zero_grad(set_to_none=True)
+
     def init_metrics(self, metrics) -> None:
+        # cache the membership tests once so the step hooks avoid repeated
+        # linear scans over the metric list
+        self._has_fid = 'fid' in metrics
+        self._has_is = 'is' in metrics
+
         self.train_g_loss = torchmetrics.MeanMetric()
         self.train_d_loss = torchmetrics.MeanMetric()
 
@@ -127,9 +184,14 @@ class WGANGPTrainer(pl.LightningModule):
             assert not self.metric_extractor is None, 'The metric_extractor should be specified.'
             if hasattr(self.metric_extractor,
                        'in_channels') and self.metric_num_features is None:
-                warnings.warn(
-                    f'No metric_num_features specified, use metric_extractor.in_channels ({self.metric_extractor.in_channels}) as metric_num_features.'
-                )
+                key = ('metric_num_features',
+                       type(self.metric_extractor).__name__,
+                       self.metric_extractor.in_channels)
+                if key not in _WARNED_ONCE:
+                    warnings.warn(
+                        f'No metric_num_features specified, use metric_extractor.in_channels ({self.metric_extractor.in_channels}) as metric_num_features.'
+                    )
+                    _WARNED_ONCE.add(key)
                 self.metric_num_features = self.metric_extractor.in_channels
             assert not self.metric_num_features is None, 'The metric_num_features should be specified.'
             self.test_fid = FrechetInceptionDistance(self.metric_extractor,
@@ -139,6 +201,52 @@ class WGANGPTrainer(pl.LightningModule):
             assert not self.metric_extractor is None, 'The metric_classifier should be specified.'
             self.test_is = InceptionScore(self.metric_classifier)
 
+        # bind the metric-update variant matching the configuration once, so
+        # the test step calls it directly instead of re-testing the flags
+        suffix = ('_fid' if self._has_fid else '') + \
+            ('_is' if self._has_is else '')
+        self._update_test_metrics = getattr(
+            self, f'_update_test_metrics{suffix or "_plain"}')
+
+    def _update_test_metrics_plain(self, x: torch.Tensor, gen_x: torch.Tensor,
+                                   batch_idx: int) -> None:
+        pass
+
+    def _update_test_metrics_fid(self, x: torch.Tensor, gen_x: torch.Tensor,
+                                 batch_idx: int) -> None:
+        if batch_idx % self.metric_update_every != 0:
+            return
+        # the metric extractor only needs forward activations, so the update
+        # runs outside the autograd graph on detached tensors, with one
+        # extractor forward over the concatenated real and fake batches;
+        # gen_x may be FP16 under autocast while the extractor is FP32
+        with torch.no_grad():
+            features = self.test_fid.inception(
+                torch.cat([x.detach().float(),
+                           gen_x.detach().float()], dim=0))
+            real_features, fake_features = features.chunk(2)
+            self.test_fid.update_features(real_features, real=True)
+            self.test_fid.update_features(fake_features, real=False)
+
+    def _update_test_metrics_is(self, x: torch.Tensor, gen_x: torch.Tensor,
+                                batch_idx: int) -> None:
+        if batch_idx % self.metric_update_every != 0:
+            return
+        # gen_x may be FP16 under autocast while the classifier is FP32
+        with torch.no_grad():
+            self.test_is.update(gen_x.detach().float())
+
+    def _update_test_metrics_fid_is(self, x: torch.Tensor,
+                                    gen_x: torch.Tensor,
+                                    batch_idx: int) -> None:
+        self._update_test_metrics_fid(x, gen_x, batch_idx)
+        self._update_test_metrics_is(x, gen_x, batch_idx)
+
+    def autocast(self):
+        return torch.cuda.amp.autocast(dtype=torch.float16,
+                                       enabled=self.amp
+                                       and self.accelerator == 'gpu')
+
     def fit(self,
             train_loader: DataLoader,
             val_loader: DataLoader,
@@ -175,50 +283,94 @@ class WGANGPTrainer(pl.LightningModule):
     def forward(self, latent: torch.Tensor) -> torch.Tensor:
         return self.generator(latent)
 
+    def on_fit_start(self) -> None:
+        if self.channels_last:
+            self.generator = self.generator.to(
+                memory_format=torch.channels_last)
+            self.discriminator = self.discriminator.to(
+                memory_format=torch.channels_last)
+
+        if self.compile:
+            if hasattr(torch, 'compile'):
+                mode = self.compile if isinstance(self.compile,
+                                                  str) else 'max-autotune'
+                self.generator = torch.compile(self.generator,
+                                               mode=mode,
+                                               dynamic=False)
+                self.discriminator = torch.compile(self.discriminator,
+                                                   mode=mode,
+                                                   dynamic=False)
+            else:
+                warnings.warn(
+                    'The compile option requires PyTorch 2.0 or later and is ignored.'
+                )
+
+    def to_channels_last(self, x: torch.Tensor) -> torch.Tensor:
+        # channels_last only applies to 4-D (NCHW) tensors
+        if self.channels_last and x.dim() == 4:
+            return x.to(memory_format=torch.channels_last)
+        return x
+
+    def sample_latent(self, x: torch.Tensor) -> torch.Tensor:
+        # a cached per-device generator avoids the lock on the global default
+        # generator and gives each rank its own deterministic stream
+        if self._latent_gen is None or self._latent_gen.device != x.device:
+            generator = torch.Generator(device=x.device)
+            generator.manual_seed(torch.initial_seed() + self.global_rank)
+            self._latent_gen = generator
+        return torch.randn(x.shape[0],
+                           self.latent_channels,
+                           device=x.device,
+                           dtype=x.dtype,
+                           generator=self._latent_gen)
+
     def predict_step(self,
                      batch: Tuple[torch.Tensor],
                      batch_idx: int,
                      dataloader_idx: int = 0):
         x, _ = batch
-        latent = torch.normal(mean=0,
-                              std=1,
-                              size=(x.shape[0], self.latent_channels))
-        latent = latent.type_as(x)
+        latent = self.sample_latent(x)
         return self(latent)
 
     def training_step(self, batch: Tuple[torch.Tensor],
                       batch_idx: int) -> torch.Tensor:
         x, _ = batch
+        x = self.to_channels_last(x)
         generator_optimizer, discriminator_optimizer = self.optimizers()
 
-        latent = torch.normal(mean=0,
-                              std=1,
-                              size=(x.shape[0], self.latent_channels))
-        latent = latent.type_as(x)
+        latent = self.sample_latent(x)
 
         # train generator
         self.toggle_optimizer(generator_optimizer)
 
-        gen_x = self.generator(latent)
-        g_loss = -torch.mean(self.discriminator(gen_x))
-        g_loss.backward()
+        with self.autocast():
+            gen_x = self.generator(latent)
+            g_loss = -torch.mean(self.discriminator(gen_x))
+        self.scaler_g.scale(g_loss).backward()
 
-        generator_optimizer.step()
-        generator_optimizer.zero_grad()
+        self.scaler_g.step(generator_optimizer)
+        self.scaler_g.update()
+        generator_optimizer.zero_grad(set_to_none=True)
         self.untoggle_optimizer(generator_optimizer)
 
         # train discriminator
         self.toggle_optimizer(discriminator_optimizer)
 
-        real_loss = self.discriminator(x)
-        fake_loss = self.discriminator(gen_x.detach())
+        # the real, fake and interpolated batches run through separate
+        # discriminator forwards: any cross-sample op (e.g. the BatchNorm
+        # layers of the bundled discriminators) would otherwise mix the
+        # statistics of the three populations and change every logit
+        with self.autocast():
+            real_loss = self.discriminator(x)
+            fake_loss = self.discriminator(gen_x.detach())
         gp_term = gradient_penalty(self.discriminator, x, gen_x)
         d_loss = -torch.mean(real_loss) + torch.mean(
             fake_loss) + self.weight_gradient_penalty * gp_term
-        d_loss.backward()
+        self.scaler_d.scale(d_loss).backward()
 
-        discriminator_optimizer.step()
-        discriminator_optimizer.zero_grad()
+        self.scaler_d.step(discriminator_optimizer)
+        self.scaler_d.update()
+        discriminator_optimizer.zero_grad(set_to_none=True)
         self.untoggle_optimizer(discriminator_optimizer)
 
         self.log("train_g_loss",
@@ -249,11 +401,11 @@ class WGANGPTrainer(pl.LightningModule):
                  logger=True)
 
         # print the metrics
-        str = "\n[Train] "
-        for key, value in self.trainer.logged_metrics.items():
-            if key.startswith("train_"):
-                str += f"{key}: {value:.3f} "
-        log.info(str + '\n')
+        line = " ".join(
+            f"{key}: {value:.3f}"
+            for key, value in self.trainer.logged_metrics.items()
+            if key.startswith("train_"))
+        log.info(f"\n[Train] {line}\n")
 
         # reset the metrics
         self.train_g_loss.reset()
@@ -263,18 +415,24 @@ class WGANGPTrainer(pl.LightningModule):
     def validation_step(self, batch: Tuple[torch.Tensor],
                         batch_idx: int) -> torch.Tensor:
         x, _ = batch
-
-        latent = torch.normal(mean=0,
-                              std=1,
-                              size=(x.shape[0], self.latent_channels))
-        latent = latent.type_as(x)
-
-        gen_x = self.generator(latent)
-        g_loss = -torch.mean(self.discriminator(gen_x))
-
-        real_loss = self.discriminator(x)
-        fake_loss = self.discriminator(gen_x.detach())
-        gp_term = gradient_penalty(self.discriminator, x, gen_x)
+        x = self.to_channels_last(x)
+
+        latent = self.sample_latent(x)
+
+        with self.autocast():
+            gen_x = self.generator(latent)
+            # no parameter update happens between the two uses, so the fake
+            # logits computed for the generator loss are reused for the
+            # discriminator loss instead of a second forward on gen_x
+            fake_logits = self.discriminator(gen_x)
+            g_loss = -torch.mean(fake_logits)
+
+            real_loss = self.discriminator(x)
+            fake_loss = fake_logits.detach()
+        gp_term = gradient_penalty(self.discriminator,
+                                   x,
+                                   gen_x,
+                                   create_graph=False)
         d_loss = -torch.mean(real_loss) + torch.mean(
             fake_loss) + self.weight_gradient_penalty * gp_term
 
@@ -298,11 +456,11 @@ class WGANGPTrainer(pl.LightningModule):
                  logger=True)
 
         # print the metrics
-        str = "\n[VAL] "
-        for key, value in self.trainer.logged_metrics.items():
-            if key.startswith("val_"):
-                str += f"{key}: {value:.3f} "
-        log.info(str + '\n')
+        line = " ".join(
+            f"{key}: {value:.3f}"
+            for key, value in self.trainer.logged_metrics.items()
+            if key.startswith("val_"))
+        log.info(f"\n[VAL] {line}\n")
 
         # reset the metrics
         self.val_g_loss.reset()
@@ -312,30 +470,31 @@ class WGANGPTrainer(pl.LightningModule):
     def test_step(self, batch: Tuple[torch.Tensor],
                   batch_idx: int) -> torch.Tensor:
         x, _ = batch
-
-        latent = torch.normal(mean=0,
-                              std=1,
-                              size=(x.shape[0], self.latent_channels))
-        latent = latent.type_as(x)
-
-        gen_x = self.generator(latent)
-        g_loss = -torch.mean(self.discriminator(gen_x))
-
-        real_loss = self.discriminator(x)
-        fake_loss = self.discriminator(gen_x.detach())
-        gp_term = gradient_penalty(self.discriminator, x, gen_x)
+        x = self.to_channels_last(x)
+
+        latent = self.sample_latent(x)
+
+        with self.autocast():
+            gen_x = self.generator(latent)
+            # no parameter update happens between the two uses, so the fake
+            # logits computed for the generator loss are reused for the
+            # discriminator loss instead of a second forward on gen_x
+            fake_logits = self.discriminator(gen_x)
+            g_loss = -torch.mean(fake_logits)
+
+            real_loss = self.discriminator(x)
+            fake_loss = fake_logits.detach()
+        gp_term = gradient_penalty(self.discriminator,
+                                   x,
+                                   gen_x,
+                                   create_graph=False)
         d_loss = -torch.mean(real_loss) + torch.mean(
             fake_loss) + self.weight_gradient_penalty * gp_term
 
         self.test_g_loss.update(g_loss)
         self.test_d_loss.update(d_loss)
 
-        if 'fid' in self.metrics:
-            self.test_fid.update(x, real=True)
-            self.test_fid.update(gen_x, real=False)
-
-        if 'is' in self.metrics:
-            self.test_is.update(gen_x)
+        self._update_test_metrics(x, gen_x, batch_idx)
 
         return g_loss, d_loss
 
@@ -353,14 +512,14 @@ class WGANGPTrainer(pl.LightningModule):
                  on_step=False,
                  logger=True)
 
-        if 'fid' in self.metrics:
+        if self._has_fid:
             self.log("test_fid",
                      self.test_fid.compute(),
                      prog_bar=False,
                      on_epoch=True,
                      on_step=False,
                      logger=True)
-        if 'is' in self.metrics:
+        if self._has_is:
             self.log("test_is",
                      self.test_is.compute()[0],
                      prog_bar=False,
@@ -369,19 +528,19 @@ class WGANGPTrainer(pl.LightningModule):
                      logger=True)
 
         # print the metrics
-        str = "\n[TEST] "
-        for key, value in self.trainer.logged_metrics.items():
-            if key.startswith("test_"):
-                str += f"{key}: {value:.3f} "
-        log.info(str + '\n')
+        line = " ".join(
+            f"{key}: {value:.3f}"
+            for key, value in self.trainer.logged_metrics.items()
+            if key.startswith("test_"))
+        log.info(f"\n[TEST] {line}\n")
 
         # reset the metrics
         self.test_g_loss.reset()
         self.test_d_loss.reset()
 
-        if 'fid' in self.metrics:
+        if self._has_fid:
             self.test_fid.reset()
-        if 'is' in self.metrics:
+        if self._has_is:
             self.test_is.reset()
 
     def configure_optimizers(self):
@@ -430,36 +589,42 @@ class CWGANGPTrainer(WGANGPTrainer):
     def training_step(self, batch: Tuple[torch.Tensor],
                       batch_idx: int) -> torch.Tensor:
         x, y = batch
+        x = self.to_channels_last(x)
         generator_optimizer, discriminator_optimizer = self.optimizers()
 
-        latent = torch.normal(mean=0,
-                              std=1,
-                              size=(x.shape[0], self.latent_channels))
-        latent = latent.type_as(x)
+        latent = self.sample_latent(x)
 
         # train generator
         self.toggle_optimizer(generator_optimizer)
 
-        gen_x = self.generator(latent, y)
-        g_loss = -torch.mean(self.discriminator(gen_x, y))
-        g_loss.backward()
+        with self.autocast():
+            gen_x = self.generator(latent, y)
+            g_loss = -torch.mean(self.discriminator(gen_x, y))
+        self.scaler_g.scale(g_loss).backward()
 
-        generator_optimizer.step()
-        generator_optimizer.zero_grad()
+        self.scaler_g.step(generator_optimizer)
+        self.scaler_g.update()
+        generator_optimizer.zero_grad(set_to_none=True)
         self.untoggle_optimizer(generator_optimizer)
 
         # train discriminator
         self.toggle_optimizer(discriminator_optimizer)
 
-        real_loss = self.discriminator(x, y)
-        fake_loss = self.discriminator(gen_x.detach(), y)
+        # the real, fake and interpolated batches run through separate
+        # discriminator forwards: any cross-sample op (e.g. the BatchNorm
+        # layers of the bundled discriminators) would otherwise mix the
+        # statistics of the three populations and change every logit
+        with self.autocast():
+            real_loss = self.discriminator(x, y)
+            fake_loss = self.discriminator(gen_x.detach(), y)
         gp_term = gradient_penalty(self.discriminator, x, gen_x, y)
         d_loss = -torch.mean(real_loss) + torch.mean(
             fake_loss) + self.weight_gradient_penalty * gp_term
-        d_loss.backward()
+        self.scaler_d.scale(d_loss).backward()
 
-        discriminator_optimizer.step()
-        discriminator_optimizer.zero_grad()
+        self.scaler_d.step(discriminator_optimizer)
+        self.scaler_d.update()
+        discriminator_optimizer.zero_grad(set_to_none=True)
         self.untoggle_optimizer(discriminator_optimizer)
 
         self.log("train_g_loss",
@@ -479,18 +644,25 @@ class CWGANGPTrainer(WGANGPTrainer):
     def validation_step(self, batch: Tuple[torch.Tensor],
                         batch_idx: int) -> torch.Tensor:
         x, y = batch
-
-        latent = torch.normal(mean=0,
-                              std=1,
-                              size=(x.shape[0], self.latent_channels))
-        latent = latent.type_as(x)
-
-        gen_x = self.generator(latent, y)
-        g_loss = -torch.mean(self.discriminator(gen_x, y))
-
-        real_loss = self.discriminator(x, y)
-        fake_loss = self.discriminator(gen_x.detach(), y)
-        gp_term = gradient_penalty(self.discriminator, x, gen_x, y)
+        x = self.to_channels_last(x)
+
+        latent = self.sample_latent(x)
+
+        with self.autocast():
+            gen_x = self.generator(latent, y)
+            # no parameter update happens between the two uses, so the fake
+            # logits computed for the generator loss are reused for the
+            # discriminator loss instead of a second forward on gen_x
+            fake_logits = self.discriminator(gen_x, y)
+            g_loss = -torch.mean(fake_logits)
+
+            real_loss = self.discriminator(x, y)
+            fake_loss = fake_logits.detach()
+        gp_term = gradient_penalty(self.discriminator,
+                                   x,
+                                   gen_x,
+                                   y,
+                                   create_graph=False)
         d_loss = -torch.mean(real_loss) + torch.mean(
             fake_loss) + self.weight_gradient_penalty * gp_term
 
@@ -503,30 +675,32 @@ class CWGANGPTrainer(WGANGPTrainer):
     def test_step(self, batch: Tuple[torch.Tensor],
                   batch_idx: int) -> torch.Tensor:
         x, y = batch
-
-        latent = torch.normal(mean=0,
-                              std=1,
-                              size=(x.shape[0], self.latent_channels))
-        latent = latent.type_as(x)
-
-        gen_x = self.generator(latent, y)
-        g_loss = -torch.mean(self.discriminator(gen_x, y))
-
-        real_loss = self.discriminator(x, y)
-        fake_loss = self.discriminator(gen_x.detach(), y)
-        gp_term = gradient_penalty(self.discriminator, x, gen_x, y)
+        x = self.to_channels_last(x)
+
+        latent = self.sample_latent(x)
+
+        with self.autocast():
+            gen_x = self.generator(latent, y)
+            # no parameter update happens between the two uses, so the fake
+            # logits computed for the generator loss are reused for the
+            # discriminator loss instead of a second forward on gen_x
+            fake_logits = self.discriminator(gen_x, y)
+            g_loss = -torch.mean(fake_logits)
+
+            real_loss = self.discriminator(x, y)
+            fake_loss = fake_logits.detach()
+        gp_term = gradient_penalty(self.discriminator,
+                                   x,
+                                   gen_x,
+                                   y,
+                                   create_graph=False)
         d_loss = -torch.mean(real_loss) + torch.mean(
             fake_loss) + self.weight_gradient_penalty * gp_term
 
         self.test_g_loss.update(g_loss)
         self.test_d_loss.update(d_loss)
 
-        if 'fid' in self.metrics:
-            self.test_fid.update(x, real=True)
-            self.test_fid.update(gen_x, real=False)
-
-        if 'is' in self.metrics:
-            self.test_is.update(gen_x)
+        self._update_test_metrics(x, gen_x, batch_idx)
 
         return g_loss, d_loss
 
@@ -538,8 +712,5 @@ class CWGANGPTrainer(WGANGPTrainer):
                      batch_idx: int,
                      dataloader_idx: int = 0):
         x, y = batch
-        latent = torch.normal(mean=0,
-                              std=1,
-                              size=(x.shape[0], self.latent_channels))
-        latent = latent.type_as(x)
+        latent = self.sample_latent(x)
         return self(latent, y)
\ No newline at end of file
@@ -19,6 +19,8 @@ class ToTensor(EEGTransform):
         t(eeg=np.random.randn(32, 128))['eeg'].shape
         >>> (32, 128)
 
+    When training on GPU, pass :obj:`pin_memory=True` to the :obj:`DataLoader` so the returned tensors can be transferred to the device with :obj:`non_blocking=True`.
+
     Args:
         apply_to_baseline (bool): Whether to apply the transform to the baseline signal. (default: :obj:`False`)
 
@@ -44,4 +46,8 @@ class ToTensor(EEGTransform):
         return super().__call__(*args, eeg=eeg, baseline=baseline, **kwargs)
 
     def apply(self, eeg: np.ndarray, **kwargs) -> torch.Tensor:
-        return torch.from_numpy(eeg).float()
\ No newline at end of file
+        # zero-copy for float32 input, single conversion otherwise
+        tensor = torch.as_tensor(eeg, dtype=torch.float32)
+        if not tensor.is_contiguous():
+            tensor = tensor.contiguous()
+        return tensor
\ No newline at end of file